@@ -1,63 +1,249 @@
 #!/usr/bin/env python3
 import os
 import sys
-import subprocess
-from datetime import datetime
-import tomli_w
-import tomllib
-import shutil
+import functools
+from collections import namedtuple
+
+# Everything else is imported where it is used, so commands like 'drip list'
+# don't pay for subprocess, threading, shutil, ... at startup.
+
+# Number of module/submodule clones allowed to run at the same time
+CLONE_JOBS = 8
+
+# Static skeleton copied by 'drip init' (bundled next to the exe by PyInstaller)
+PROJECT_TEMPLATE_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))),
+                                    "templates", "project")
+
+# First "<serial>\tdevice" line of 'adb devices' output (re.MULTILINE)
+ADB_DEVICE_PATTERN = r"^(\S+)\tdevice\s*$"
+
+# Read-only view of drip.toml with the defaults filled in. namedtuple rather
+# than dataclass: collections is already loaded at startup, dataclasses is not.
+ProjectConfig = namedtuple("ProjectConfig", ["name", "type", "created"],
+                           defaults=[None, "normal", None])
+BuildConfig = namedtuple("BuildConfig", ["output_dir", "main_file"],
+                         defaults=["build", "main.drop"])
+MistConfig = namedtuple("MistConfig", ["assets_dir", "gradle_task", "package_name", "main_activity"],
+                        defaults=["android/app/src/main/assets", "assembleDebug", "com.mist.app", "MainActivity"])
+DripConfig = namedtuple("DripConfig", ["project", "modules", "build", "mist", "scripts"])
 
 # ---------- Helpers ----------
+# A module's own drip.toml could not be read or parsed
+class ModuleConfigError(Exception):
+    pass
+
+# rtoml is a much faster native TOML reader/writer; fall back to tomllib/tomli_w
+@functools.lru_cache(maxsize=None)
+def get_rtoml():
+    try:
+        import rtoml
+    except ImportError:
+        return None
+    return rtoml
+
+def toml_loads(raw):
+    rtoml = get_rtoml()
+    if rtoml:
+        return rtoml.loads(raw.decode())
+    import tomllib
+    return tomllib.loads(raw.decode())
+
+def toml_dumps(data):
+    rtoml = get_rtoml()
+    if rtoml:
+        return rtoml.dumps(data).encode()
+    import tomli_w
+    return tomli_w.dumps(data).encode()
+
+# Date stamped into drip.toml; computed once so one command uses a single date
+@functools.lru_cache(maxsize=None)
+def today():
+    from datetime import datetime
+    return datetime.now().strftime("%Y-%m-%d")
+
+# Parsed drip.toml is cached as JSON in the per-user cache dir, one file per
+# project, keyed by the SHA-256 of the drip.toml contents. Nothing is written
+# into the project and the cache is data-only, so a checkout can't plant one.
+def drip_cache_file(drip_file):
+    import hashlib
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    name = hashlib.sha256(os.path.abspath(drip_file).encode()).hexdigest()
+    return os.path.join(base, "drip", f"{name}.json")
+
+def read_drip_cache(drip_file, key):
+    import json
+    try:
+        with open(drip_cache_file(drip_file), "rb") as f:
+            cached = json.load(f)
+        if cached["key"] == key:
+            return cached["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing or corrupt cache: just parse drip.toml
+        pass
+    return None
+
+def write_drip_cache(drip_file, key, data):
+    import json
+    cache_file = drip_cache_file(drip_file)
+    try:
+        payload = json.dumps({"key": key, "data": data})
+    except (TypeError, ValueError):
+        # TOML dates/times have no JSON form; such files are simply not cached
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(payload)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
 def load_drip_toml(project_path):
+    import hashlib
     drip_file = os.path.join(project_path, "drip.toml")
-    if not os.path.exists(drip_file):
+    try:
+        with open(drip_file, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
         return None, drip_file
-    with open(drip_file, "rb") as f:
-        data = tomllib.load(f)
+    key = hashlib.sha256(raw).hexdigest()
+    data = read_drip_cache(drip_file, key)
+    if data is None:
+        data = toml_loads(raw)
+        write_drip_cache(drip_file, key, data)
     return data, drip_file
 
 def save_drip_toml(data, drip_file):
+    import hashlib
+    raw = toml_dumps(data)
     with open(drip_file, "wb") as f:
-        tomli_w.dump(data, f)
+        f.write(raw)
+    write_drip_cache(drip_file, hashlib.sha256(raw).hexdigest(), data)
 
+# Loads drip.toml of the current directory, exiting if it is not a Drip project
 def ensure_project_exists():
-    if not os.path.exists("drip.toml"):
+    data, drip_file = load_drip_toml(os.getcwd())
+    if data is None:
         print("Error: Not a Drip project. Run 'drip init <project_name>' first.")
         sys.exit(1)
+    return data, drip_file
 
-def run_shell(cmd, cwd=None, hide_output=False):
+def config_table(data, name, required=False):
+    if name not in data and not required:
+        return {}
+    table = data[name]
+    if not isinstance(table, dict):
+        raise TypeError(f"[{name}] must be a table")
+    return table
+
+# Only the fields listed in checked are type-checked; the others are informational
+# (e.g. project.created, which users may write as a TOML date)
+def config_section(cls, data, name, required=False, checked=None):
+    table = config_table(data, name, required)
+    for key in checked if checked is not None else cls._fields:
+        if key in table and not isinstance(table[key], str):
+            raise TypeError(f"'{name}.{key}' must be a string")
+    return cls(**{key: table[key] for key in cls._fields if key in table})
+
+def parse_config(data):
     try:
-        if hide_output:
-            subprocess.run(cmd, shell=True, check=True, cwd=cwd,
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL)
-        else:
-            subprocess.run(cmd, shell=True, check=True, cwd=cwd)
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing command: {cmd}\n{e}")
+        return DripConfig(
+            project=config_section(ProjectConfig, data, "project", required=True, checked=("type",)),
+            modules=config_table(data, "modules"),
+            build=config_section(BuildConfig, data, "build"),
+            mist=config_section(MistConfig, data, "mist"),
+            scripts=config_table(data, "scripts"),
+        )
+    except KeyError as e:
+        print(f"Error: Invalid drip.toml: missing [{e.args[0]}] table")
+    except TypeError as e:
+        print(f"Error: Invalid drip.toml: {e}")
+    sys.exit(1)
+
+# Like ensure_project_exists, for commands that only read drip.toml
+def load_config():
+    data, _ = ensure_project_exists()
+    return parse_config(data)
+
+# Mirrors src into dst, skipping files whose size and mtime already match.
+# Changed files are hardlinked, or copied where linking is not possible.
+def sync_tree(src, dst):
+    import shutil
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            dst_path = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                sync_tree(entry.path, dst_path)
+                continue
+            src_stat = entry.stat()
+            try:
+                dst_stat = os.stat(dst_path)
+                if (dst_stat.st_mtime_ns, dst_stat.st_size) == (src_stat.st_mtime_ns, src_stat.st_size):
+                    continue
+                os.remove(dst_path)
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(entry.path, dst_path)
+            except OSError:
+                shutil.copy2(entry.path, dst_path)
+
+# Creates dst from the template at src as fresh files and directories: only
+# contents are copied, not mtimes or modes, so the project looks newly written.
+# .gitkeep only keeps the empty template dirs in git and is skipped; build/
+# would otherwise mirror it into the Mist assets.
+def instantiate_template(src, dst):
+    import shutil
+    os.makedirs(dst)
+    for root, dirs, files in os.walk(src):
+        target_root = os.path.join(dst, os.path.relpath(root, src))
+        for name in dirs:
+            os.mkdir(os.path.join(target_root, name))
+        for name in files:
+            if name != ".gitkeep":
+                shutil.copyfile(os.path.join(root, name), os.path.join(target_root, name))
+
+# argv is a list of arguments; only user scripts from drip.toml go through the shell.
+# Raises CalledProcessError/OSError on failure, see run_shell for the exiting variant.
+def run_command(argv, cwd=None, hide_output=False, shell=False):
+    import subprocess
+    if hide_output:
+        subprocess.run(argv, shell=shell, check=True, cwd=cwd,
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+    else:
+        subprocess.run(argv, shell=shell, check=True, cwd=cwd)
+
+def run_shell(argv, cwd=None, hide_output=False, shell=False):
+    import subprocess
+    try:
+        run_command(argv, cwd=cwd, hide_output=hide_output, shell=shell)
+    except (subprocess.CalledProcessError, OSError) as e:
+        import shlex
+        print(f"Error executing command: {argv if shell else shlex.join(argv)}\n{e}")
         sys.exit(1)
 
 # ---------- Commands ----------
 def init_project(project_name, mist=False):
-    if os.path.exists(project_name):
+    # main.drop, build/ and .dp_modules/ come from the template
+    try:
+        instantiate_template(PROJECT_TEMPLATE_DIR, project_name)
+    except FileExistsError:
         print(f"Error: Directory '{project_name}' already exists.")
         return
 
-    os.makedirs(os.path.join(project_name, ".dp_modules"), exist_ok=True)
-    os.makedirs(os.path.join(project_name, "build"), exist_ok=True)  # create build folder
-
-    # main.drop in root
-    main_file = os.path.join(project_name, "main.drop")
-    with open(main_file, "w") as f:
-        f.write("// Your Droplet code starts here\n")
-
     # Create drip.toml with default config
     drip_file = os.path.join(project_name, "drip.toml")
     data = {
         "project": {
             "name": project_name,
             "type": "mist" if mist else "normal",
-            "created": datetime.now().strftime("%Y-%m-%d")
+            "created": today()
         },
         "modules": {},
         "build": {
@@ -81,7 +267,9 @@ def init_project(project_name, mist=False):
     if mist:
         android_dir = os.path.join(project_name, "android")
         print(f"Downloading Mist Android project ...")
-        git_cmd = f"git clone --recursive https://github.com/droplet-lang/mist.git \"{android_dir}\""
+        git_cmd = ["git", "clone", "--recurse-submodules", "--jobs", str(CLONE_JOBS),
+                   "--depth", "1", "--shallow-submodules",
+                   "https://github.com/droplet-lang/mist.git", android_dir]
         run_shell(git_cmd, hide_output=True)
         print("Mist project downloaded successfully!")
 
@@ -92,78 +280,211 @@ def init_project(project_name, mist=False):
 
 # ---------- Updated run_script ----------
 def run_script(script_name):
-    ensure_project_exists()
+    cfg = load_config()
     project_path = os.getcwd()
-    data, _ = load_drip_toml(project_path)
-    scripts = data.get("scripts", {})
+    scripts = cfg.scripts
 
     if script_name not in scripts:
         print(f"Script '{script_name}' not found in drip.toml")
         return
 
     cmd = scripts[script_name]
-    build_dir = data.get("build", {}).get("output_dir", "build")
-    main_file = data.get("build", {}).get("main_file", "main.drop")
+    build_dir = cfg.build.output_dir
+    main_file = cfg.build.main_file
 
     if not cmd:
         if script_name in ("compile", "start"):
             print(f"Compiling {main_file}...")
             os.makedirs(build_dir, exist_ok=True)
-            run_shell(f"droplet compile {main_file} -o {build_dir}/bundle.dbc")
+            run_shell(["droplet", "compile", main_file, "-o", os.path.join(build_dir, "bundle.dbc")])
             print("Compilation complete.")
 
-            if data["project"].get("type") == "mist":
-                assets_dir = data.get("mist", {}).get("assets_dir", "android/app/src/main/assets")
-                os.makedirs(assets_dir, exist_ok=True)
-                shutil.copytree(build_dir, assets_dir, dirs_exist_ok=True)
+            if cfg.project.type == "mist":
+                assets_dir = cfg.mist.assets_dir
+                sync_tree(build_dir, assets_dir)
                 print("Assets copied to Android project.")
 
             if script_name == "start":
                 android_dir = os.path.join(project_path, "android")
-                gradlew = "gradlew.bat" if os.name == "nt" else "./gradlew"
-                gradle_task = data.get("mist", {}).get("gradle_task", "assembleDebug")
+                gradlew = os.path.join(android_dir, "gradlew.bat" if os.name == "nt" else "gradlew")
+                gradle_task = cfg.mist.gradle_task
                 print(f"Building Mist Android APK ({gradle_task}) ...")
-                run_shell(f"{gradlew} {gradle_task}", cwd=android_dir)
+                run_shell([gradlew, gradle_task], cwd=android_dir)
 
                 apk_path = os.path.join(android_dir, "app", "build", "outputs", "apk", "debug", "app-debug.apk")
                 if not os.path.exists(apk_path):
                     print("Error: APK not found!")
                     return
 
-                result = subprocess.run("adb devices", shell=True, capture_output=True, text=True)
-                devices = [line.split()[0] for line in result.stdout.splitlines() if "\tdevice" in line]
-                if not devices:
+                import re
+                import subprocess
+                try:
+                    result = subprocess.run(["adb", "devices"], capture_output=True, text=True)
+                    match = re.search(ADB_DEVICE_PATTERN, result.stdout, re.MULTILINE)
+                except OSError:
+                    match = None
+                if not match:
                     print("No connected devices found.")
                     return
-                device = devices[0]
+                device = match.group(1)
                 print(f"Using device: {device}")
 
-                package_name = data.get("mist", {}).get("package_name", "com.mist.app")
-                main_activity = data.get("mist", {}).get("main_activity", "MainActivity")
+                package_name = cfg.mist.package_name
+                main_activity = cfg.mist.main_activity
 
                 print(f"Installing APK...")
-                run_shell(f"adb -s {device} install -r {apk_path}")
+                run_shell(["adb", "-s", device, "install", "-r", apk_path])
 
                 print(f"Launching Mist app...")
-                run_shell(f"adb -s {device} shell am start -n {package_name}/.{main_activity}")
+                run_shell(["adb", "-s", device, "shell", "am", "start", "-n", f"{package_name}/.{main_activity}"])
                 print("Mist app started successfully!")
         else:
             print(f"Script '{script_name}' has no command configured.")
     else:
-        run_shell(cmd)
+        run_shell(cmd, shell=True)
 
 # ---------- Module Management ----------
-def install_module(repo_url, version=None, visited=None, stack=None):
-    ensure_project_exists()
-    if visited is None:
-        visited = set()
-    if stack is None:
-        stack = []
+# The same URL is looked up by both fetch_modules and record_module
+@functools.lru_cache(maxsize=None)
+def module_name_from_url(repo_url):
+    return os.path.basename(repo_url).removesuffix(".git")
+
+# Module names become directories under .dp_modules, so they must name a direct child
+def is_valid_module_name(module_name):
+    return module_name not in ("", ".", "..") and os.path.basename(module_name) == module_name
+
+# Deletes a module directory created by a failed install, refusing anything
+# that does not resolve to a direct child of modules_dir
+def remove_cloned_module(modules_dir, module_name):
+    import shutil
+    target_dir = os.path.realpath(os.path.join(modules_dir, module_name))
+    if os.path.dirname(target_dir) != os.path.realpath(modules_dir):
+        return
+    shutil.rmtree(target_dir, ignore_errors=True)
 
-    project_path = os.getcwd()
-    module_name = os.path.basename(repo_url).replace(".git", "")
+def fetch_module(repo_url, version, target_dir, installed):
+    module_name = os.path.basename(target_dir)
+    if installed:
+        print(f"Module '{module_name}' already installed.")
+    else:
+        print(f"Downloading module '{module_name}' ...")
+        # Modules only need their current tree: shallow, single-branch, blobless
+        git_cmd = ["git", "-c", "protocol.version=2", "clone",
+                   "--depth", "1", "--single-branch", "--no-tags", "--filter=blob:none"]
+        if version:
+            git_cmd += ["--branch", version]
+        git_cmd += [repo_url, target_dir]
+        # Raises instead of exiting: this runs on a worker thread, fetch_modules reports it
+        run_command(git_cmd, hide_output=True)
+        print(f"Module '{module_name}' downloaded successfully!")
 
-    if module_name in stack:
+    # The file is closed as soon as it is parsed; dependencies are handled by the caller
+    try:
+        with open(os.path.join(target_dir, "drip.toml"), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return module_name, {}
+    except OSError as e:
+        raise ModuleConfigError(e) from e
+    try:
+        module_data = toml_loads(raw)
+    except Exception as e:
+        raise ModuleConfigError(e) from e
+    return module_name, module_data.get("modules", {})
+
+# Clones a module and its transitive dependencies, CLONE_JOBS at a time.
+# Returns module name -> {"source", "version", "modules"}: the URL and version
+# that were actually fetched, and the [modules] table of the module's drip.toml.
+# A failed clone stops the install and removes the modules cloned by this run;
+# an unreadable module drip.toml stops it too but keeps what was downloaded.
+def fetch_modules(repo_url, version, project_path):
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    graph = {}
+    # Scheduling state below is only touched on this (the main) thread;
+    # workers just get the arguments they need
+    scheduled = {}
+
+    # One listing of .dp_modules instead of a stat per module
+    modules_dir = os.path.join(project_path, ".dp_modules")
+    try:
+        with os.scandir(modules_dir) as entries:
+            installed = {entry.name for entry in entries if entry.is_dir()}
+    except FileNotFoundError:
+        os.makedirs(modules_dir)
+        installed = set()
+
+    # future -> (module name, whether it was installed before this run)
+    submitted = {}
+
+    with ThreadPoolExecutor(max_workers=CLONE_JOBS) as pool:
+        def abort(message, rollback=True):
+            # Let clones already running finish, drop the queued ones, then remove
+            # only the directories that clones of this run successfully created
+            pool.shutdown(wait=True, cancel_futures=True)
+            if rollback:
+                for future, (name, was_installed) in submitted.items():
+                    if not was_installed and not future.cancelled() and future.exception() is None:
+                        remove_cloned_module(modules_dir, name)
+            print(message)
+            sys.exit(1)
+
+        def schedule(url, ver):
+            module_name = module_name_from_url(url)
+            if not is_valid_module_name(module_name):
+                abort(f"Error: Cannot derive a module name from '{url}'.")
+            if module_name in scheduled:
+                fetched_version = scheduled[module_name][1]
+                if (ver or "main") != (fetched_version or "main"):
+                    print(f"Warning: module '{module_name}' is required at version '{ver or 'main'}', "
+                          f"keeping '{fetched_version or 'main'}'.")
+                return None
+            scheduled[module_name] = (url, ver)
+            is_installed = module_name in installed
+            target_dir = os.path.join(modules_dir, module_name)
+            future = pool.submit(fetch_module, url, ver, target_dir, is_installed)
+            submitted[future] = (module_name, is_installed)
+            return future
+
+        pending = {schedule(repo_url, version)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    module_name, deps = future.result()
+                except ModuleConfigError as e:
+                    # The downloads themselves are fine; keep them for the next install
+                    abort(f"Error: Invalid drip.toml in module '{submitted[future][0]}':\n{e}", rollback=False)
+                except (subprocess.CalledProcessError, OSError) as e:
+                    abort(f"Error: Failed to download module '{submitted[future][0]}':\n{e}")
+                url, ver = scheduled[module_name]
+                graph[module_name] = {"source": url, "version": ver, "modules": deps}
+                for dep_info in deps.values():
+                    dep_url = dep_info.get("source")
+                    if dep_url:
+                        dep_future = schedule(dep_url, dep_info.get("version"))
+                        if dep_future:
+                            pending.add(dep_future)
+    return graph
+
+# Each module lists the modules depending on it under "dependents".
+# Files written before that field existed get the index rebuilt on first use.
+def index_dependents(modules):
+    if all("dependents" in mod for mod in modules.values()):
+        return
+    for mod in modules.values():
+        mod["dependents"] = []
+    for name, mod in modules.items():
+        for dep in mod.get("dependencies", []):
+            if dep in modules:
+                modules[dep]["dependents"].append(name)
+
+# Adds a fetched module and its dependencies to the in-memory drip.toml data
+# stack keeps the current path for error messages, on_stack mirrors it for lookups
+def record_module(repo_url, version, data, graph, visited, stack, on_stack):
+    module_name = module_name_from_url(repo_url)
+
+    if module_name in on_stack:
         print(f"Error: Circular dependency detected: {' -> '.join(stack + [module_name])}")
         return
 
@@ -171,69 +492,71 @@ def install_module(repo_url, version=None, visited=None, stack=None):
         return
     visited.add(module_name)
     stack.append(module_name)
-
-    target_dir = os.path.join(project_path, ".dp_modules", module_name)
-    data, drip_file = load_drip_toml(project_path)
-
-    if os.path.exists(target_dir):
-        print(f"Module '{module_name}' already installed.")
-    else:
-        print(f"Downloading module '{module_name}' ...")
-        git_cmd = f"git clone --depth 1 {'--branch ' + version if version else ''} \"{repo_url}\" \"{target_dir}\""
-        run_shell(git_cmd, hide_output=True)
-        print(f"Module '{module_name}' downloaded successfully!")
-
-    # Update drip.toml
-    if module_name not in data["modules"]:
-        data["modules"][module_name] = {
-            "source": repo_url,
-            "version": version or "main",
-            "installed": datetime.now().strftime("%Y-%m-%d"),
-            "dependencies": []
-        }
+    on_stack.add(module_name)
+    # Record what fetch_modules actually cloned, which may differ from what this edge asked for
+    fetched = graph.get(module_name, {"source": repo_url, "version": version, "modules": {}})
+    try:
+        if module_name not in data["modules"]:
+            data["modules"][module_name] = {
+                "source": fetched["source"],
+                "version": fetched["version"] or "main",
+                "installed": today(),
+                "dependencies": [],
+                "dependents": []
+            }
+
+        # Record dependencies, which were all cloned by fetch_modules
+        for dep_name, dep_info in fetched["modules"].items():
+            dep_url = dep_info.get("source")
+            dep_version = dep_info.get("version")
+            if dep_url:
+                record_module(dep_url, dep_version, data, graph, visited, stack, on_stack)
+                if dep_name not in data["modules"][module_name]["dependencies"]:
+                    data["modules"][module_name]["dependencies"].append(dep_name)
+                dep_entry = data["modules"].get(dep_name)
+                if dep_entry is not None and module_name not in dep_entry["dependents"]:
+                    dep_entry["dependents"].append(module_name)
+    finally:
+        on_stack.discard(module_name)
+        stack.pop()
+
+def install_module(repo_url, version=None):
+    data, drip_file = ensure_project_exists()
+    graph = fetch_modules(repo_url, version, os.getcwd())
+    index_dependents(data["modules"])
+    record_module(repo_url, version, data, graph, set(), [], set())
     save_drip_toml(data, drip_file)
 
-    # Recursively install dependencies
-    module_drip_file = os.path.join(target_dir, "drip.toml")
-    if os.path.exists(module_drip_file):
-        with open(module_drip_file, "rb") as f:
-            module_data = tomllib.load(f)
-            deps = module_data.get("modules", {})
-            for dep_name, dep_info in deps.items():
-                dep_url = dep_info.get("source")
-                dep_version = dep_info.get("version")
-                if dep_url:
-                    install_module(dep_url, dep_version, visited, stack.copy())
-                    if dep_name not in data["modules"][module_name]["dependencies"]:
-                        data["modules"][module_name]["dependencies"].append(dep_name)
-        save_drip_toml(data, drip_file)
-
-    stack.pop()
-
 def remove_module(module_name):
-    ensure_project_exists()
+    import shutil
+    data, drip_file = ensure_project_exists()
     project_path = os.getcwd()
-    data, drip_file = load_drip_toml(project_path)
 
     target_dir = os.path.join(project_path, ".dp_modules", module_name)
-    if not os.path.exists(target_dir):
+    if not os.path.isdir(target_dir):
         print(f"Module '{module_name}' is not installed.")
         return
 
     shutil.rmtree(target_dir)
-    if module_name in data["modules"]:
-        del data["modules"][module_name]
-    for mod in data["modules"].values():
-        if "dependencies" in mod and module_name in mod["dependencies"]:
-            mod["dependencies"].remove(module_name)
+    modules = data["modules"]
+    index_dependents(modules)
+    removed = modules.pop(module_name, None)
+    if removed is None:
+        # Not recorded, so not indexed either
+        dependents = [name for name, mod in modules.items() if module_name in mod.get("dependencies", [])]
+    else:
+        dependents = removed["dependents"]
+        for dep in removed.get("dependencies", []):
+            if dep in modules and module_name in modules[dep]["dependents"]:
+                modules[dep]["dependents"].remove(module_name)
+    for name in dependents:
+        if name in modules and module_name in modules[name].get("dependencies", []):
+            modules[name]["dependencies"].remove(module_name)
     save_drip_toml(data, drip_file)
     print(f"Module '{module_name}' removed successfully.")
 
 def list_modules():
-    ensure_project_exists()
-    project_path = os.getcwd()
-    data, _ = load_drip_toml(project_path)
-    modules = data.get("modules", {})
+    modules = load_config().modules
     if not modules:
         print("No modules installed.")
         return
@@ -5,7 +5,7 @@ a = Analysis(
     ['drip.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('templates', 'templates')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},